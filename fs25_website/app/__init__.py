@@ -1,22 +1,39 @@
+import os
+
 from flask import Flask, render_template, redirect, url_for
+from jinja2 import FileSystemBytecodeCache, TemplateError
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, current_user
-from flask_migrate import Migrate
 
 # Create extension instances here (global)
 db = SQLAlchemy()
 login_manager = LoginManager()
-migrate = Migrate()
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
-    app.config['SECRET_KEY'] = 'devkey'
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///fs25.db'
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'devkey')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///fs25.db')
+    app.config['TEMPLATE_CACHE_DIR'] = os.environ.get('TEMPLATE_CACHE_DIR')
+    app.config['ENABLE_MIGRATIONS'] = True
+    if config:
+        app.config.update(config)
+
+    # Reuse compiled templates across processes (built into the image at docker build time)
+    if app.config['TEMPLATE_CACHE_DIR']:
+        os.makedirs(app.config['TEMPLATE_CACHE_DIR'], exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['TEMPLATE_CACHE_DIR'])
 
     # Initialize extensions with app
     db.init_app(app)
     login_manager.init_app(app)
-    migrate.init_app(app, db)
+
+    # Alembic is only needed for `flask db ...`; importing it costs ~200ms of worker boot
+    if app.config['ENABLE_MIGRATIONS']:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    from app.audit import audit
+    audit.init_app(app)
 
     # Import blueprints here (to avoid circular imports)
     from app.main.routes import bp as main_bp
@@ -55,3 +72,20 @@ def create_app():
             return redirect(url_for('auth.login'))
 
     return app
+
+
+def warm_template_cache(app):
+    """Compile every template up front so workers never parse Jinja on a request.
+
+    Call this once in the gunicorn master (``preload_app``) and forked workers
+    inherit the compiled templates. Returns the number of templates loaded.
+    """
+    loaded = 0
+    for name in app.jinja_env.list_templates():
+        try:
+            app.jinja_env.get_template(name)
+        except TemplateError as e:
+            app.logger.warning("Skipping template %s: %s", name, e)
+            continue
+        loaded += 1
+    return loaded
@@ -1,7 +1,10 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+import json
+from datetime import datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 from app.models import User, Company
-from app import db
+from app.audit import audit
+from app.unit_of_work import unit_of_work
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -31,9 +34,16 @@ def promote_user():
 
     user_id = int(request.form['user_id'])
     new_role = request.form['role']
-    user = User.query.get_or_404(user_id)
-    user.role = new_role
-    db.session.commit()
+
+    def promote(session):
+        user = User.query.get_or_404(user_id)
+        previous_role = user.role
+        user.role = new_role
+        return user, previous_role
+
+    user, previous_role = unit_of_work(promote)
+    audit.record('user.promote', current_user.id, 'user', user_id,
+                 previous_role=previous_role, role=new_role)
     flash(f"{user.username} promoted to {new_role}.")
     return redirect(url_for('admin.admin_panel'))
 
@@ -55,12 +65,45 @@ def companies():
             return redirect(url_for('admin.companies'))
 
         # Create and add new company
-        new_company = Company(name=name, description=description)
-        db.session.add(new_company)
-        db.session.commit()
+        unit_of_work(lambda session: session.add(Company(name=name, description=description)))
 
         flash('Company created successfully!')
         return redirect(url_for('admin.companies'))
 
     companies = Company.query.all()
     return render_template('admin/companies.html', companies=companies)
+
+@bp.route('/audit')
+@login_required
+def audit_log():
+    if current_user.role != 'admin':
+        flash("Access denied.")
+        return redirect(url_for('dot.dot_home'))
+
+    try:
+        since = request.args.get('since')
+        until = request.args.get('until')
+        events = audit.query(
+            actor_id=request.args.get('actor_id', type=int),
+            target_type=request.args.get('target_type'),
+            target_id=request.args.get('target_id', type=int),
+            action=request.args.get('action'),
+            since=datetime.fromisoformat(since) if since else None,
+            until=datetime.fromisoformat(until) if until else None,
+            limit=max(1, min(request.args.get('limit', 100, type=int), 1000))
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid date"}), 400
+
+    return jsonify([
+        {
+            'id': e.id,
+            'created_at': e.created_at.isoformat(),
+            'actor_id': e.actor_id,
+            'action': e.action,
+            'target_type': e.target_type,
+            'target_id': e.target_id,
+            'details': json.loads(e.details) if e.details else None
+        }
+        for e in events
+    ]), 200
@@ -0,0 +1,181 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert, select
+
+from app import db
+from app.models import AuditEvent
+
+
+class AuditLog:
+    """
+    Write-behind audit trail for privileged actions.
+
+    record() only appends to an in-memory queue; a background thread writes the
+    events to the audit_event table in batches on its own connection, outside
+    the request's transaction. The queue is bounded: when it is full the caller
+    waits briefly and then writes its events itself (one attempt, no sleeps),
+    so a slow database pushes back on writers instead of growing memory.
+    Events that still cannot be written are logged in full at ERROR level so
+    the trail can be recovered from the app log. Whatever is still queued is
+    flushed at shutdown.
+
+    Like db and login_manager, one instance serves any number of apps: each app
+    gets its own queue and writer in app.extensions['audit'], and the methods
+    below act on the current app.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AUDIT_QUEUE_SIZE', 10000)
+        app.config.setdefault('AUDIT_BATCH_SIZE', 200)
+        app.config.setdefault('AUDIT_FLUSH_INTERVAL', 1.0)  # seconds
+        app.config.setdefault('AUDIT_PUT_TIMEOUT', 0.5)  # seconds a full queue blocks a writer
+        writer = _AuditWriter(app)
+        app.extensions['audit'] = writer
+        atexit.register(writer.shutdown)
+
+    def record(self, action, actor_id=None, target_type=None, target_id=None, **details):
+        self._writer().enqueue([_event(action, actor_id, target_type, target_id, details)])
+
+    def record_many(self, action, actor_id, target_type, target_ids, **details):
+        """Record the same action on many targets as a single queue entry."""
+        events = [_event(action, actor_id, target_type, target_id, details) for target_id in target_ids]
+        if events:
+            self._writer().enqueue(events)
+
+    def flush(self):
+        """Write everything queued so far from the calling thread."""
+        self._writer().flush()
+
+    def shutdown(self, app=None):
+        (app or current_app).extensions['audit'].shutdown()
+
+    def query(self, actor_id=None, target_type=None, target_id=None, action=None,
+              since=None, until=None, limit=100):
+        """Newest-first audit events matching every given filter."""
+        self.flush()
+        stmt = select(AuditEvent).order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc())
+        if actor_id is not None:
+            stmt = stmt.where(AuditEvent.actor_id == actor_id)
+        if target_type is not None:
+            stmt = stmt.where(AuditEvent.target_type == target_type)
+        if target_id is not None:
+            stmt = stmt.where(AuditEvent.target_id == target_id)
+        if action is not None:
+            stmt = stmt.where(AuditEvent.action == action)
+        if since is not None:
+            stmt = stmt.where(AuditEvent.created_at >= since)
+        if until is not None:
+            stmt = stmt.where(AuditEvent.created_at < until)
+        return db.session.scalars(stmt.limit(limit)).all()
+
+    def _writer(self):
+        return current_app.extensions['audit']
+
+
+class _AuditWriter:
+    """Queue and background writer thread for one app."""
+
+    def __init__(self, app):
+        self.app = app
+        self._queue = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def enqueue(self, events):
+        self._ensure_worker()
+        try:
+            self._queue.put(events, timeout=self.app.config['AUDIT_PUT_TIMEOUT'])
+        except queue.Full:
+            # Backpressure: the request thread pays for one write, but never sleeps on retries
+            self._write(events, attempts=1)
+
+    def flush(self):
+        if self._queue is None:
+            return
+        while True:
+            batch = self._drain(self.app.config['AUDIT_BATCH_SIZE'])
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _ensure_worker(self):
+        # Started lazily and per process: a thread (or a queue lock) from the
+        # gunicorn master does not survive the fork into a worker
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.app.config['AUDIT_QUEUE_SIZE'])
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        interval = self.app.config['AUDIT_FLUSH_INTERVAL']
+        batch_size = self.app.config['AUDIT_BATCH_SIZE']
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=interval)
+            except queue.Empty:
+                continue
+            self._write(first + self._drain(batch_size - len(first)))
+
+    def _drain(self, limit):
+        # Queue entries are lists of events; stop once the batch holds `limit` events
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.extend(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch, attempts=3):
+        for attempt in range(attempts):
+            try:
+                with self.app.app_context(), db.engine.begin() as conn:
+                    conn.execute(insert(AuditEvent.__table__), batch)
+                return
+            except Exception:
+                if attempt == attempts - 1:
+                    self.app.logger.exception("Could not write %d audit event(s)", len(batch))
+                    for event in batch:
+                        self.app.logger.error("Unwritten audit event: %s", json.dumps(event, sort_keys=True, default=str))
+                    return
+                time.sleep(0.1 * 2 ** attempt)
+
+
+def _event(action, actor_id, target_type, target_id, details):
+    return {
+        'created_at': datetime.utcnow(),
+        'actor_id': actor_id,
+        'action': action,
+        'target_type': target_type,
+        'target_id': target_id,
+        'details': json.dumps(details, sort_keys=True, default=str) if details else None,
+    }
+
+
+audit = AuditLog()
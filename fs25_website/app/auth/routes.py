@@ -2,7 +2,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import login_user, login_required, logout_user, current_user
 from app.models import User
-from app import db
+from app.unit_of_work import unit_of_work
 from datetime import datetime
 
 bp = Blueprint('auth', __name__, url_prefix='/auth')
@@ -18,8 +18,12 @@ def login():
             login_user(user)
 
             # Record login time
-            user.login_time = datetime.utcnow()
-            db.session.commit()
+            login_time = datetime.utcnow()
+
+            def record_login(session):
+                user.login_time = login_time
+
+            unit_of_work(record_login)
 
             # Redirect by role
             if user.role == 'admin':
@@ -48,9 +52,7 @@ def register():
             return redirect(url_for('auth.register'))
 
         hashed_pw = generate_password_hash(password)
-        new_user = User(username=username, password=hashed_pw)
-        db.session.add(new_user)
-        db.session.commit()
+        unit_of_work(lambda session: session.add(User(username=username, password=hashed_pw)))
         flash('Registered successfully! Please log in.')
         return redirect(url_for('auth.login'))
 
@@ -60,13 +62,17 @@ def register():
 @login_required
 def logout():
     # Record logout time and update total logged hours
-    current_user.logout_time = datetime.utcnow()
-    if current_user.login_time:
-        delta = current_user.logout_time - current_user.login_time
-        hours = delta.total_seconds() / 3600.0
-        current_user.total_logged_hours += hours
-    current_user.login_time = None
-    db.session.commit()
+    logout_time = datetime.utcnow()
+
+    def record_logout(session):
+        current_user.logout_time = logout_time
+        if current_user.login_time:
+            delta = current_user.logout_time - current_user.login_time
+            hours = delta.total_seconds() / 3600.0
+            current_user.total_logged_hours += hours
+        current_user.login_time = None
+
+    unit_of_work(record_logout)
 
     logout_user()
     return redirect(url_for('auth.login'))
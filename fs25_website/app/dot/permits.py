@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, select, update
+
+from app.models import Permit
+from app.unit_of_work import unit_of_work
+
+# A claim lapses if the reviewer walks away, so the permits go back to the queue
+CLAIM_TIMEOUT = timedelta(minutes=15)
+QUEUE_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+DECISIONS = {'approve': 'approved', 'reject': 'rejected'}
+
+
+def claim_permits(reviewer_id, limit=QUEUE_PAGE_SIZE):
+    """
+    Give a reviewer a page of the oldest pending permits that nobody else holds.
+
+    The oldest permits the reviewer already holds count towards the page and
+    have their claim renewed; any held beyond the page size are left to lapse.
+    New ones are claimed with one UPDATE whose WHERE clause re-checks the
+    claim, so two supervisors never get the same permit.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    now = datetime.utcnow()
+    stale = now - CLAIM_TIMEOUT
+
+    def claim(session):
+        oldest_held = (
+            select(Permit.id)
+            .where(Permit.claimed_by == reviewer_id, Permit.status == 'pending')
+            .order_by(Permit.created_at, Permit.id)
+            .limit(limit)
+        )
+        held = session.execute(
+            update(Permit)
+            .where(Permit.id.in_(oldest_held.scalar_subquery()))
+            .values(claimed_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        if held < limit:
+            claimable = or_(Permit.claimed_by.is_(None), Permit.claimed_at < stale)
+            oldest = (
+                select(Permit.id)
+                .where(Permit.status == 'pending', claimable)
+                .order_by(Permit.created_at, Permit.id)
+                .limit(limit - held)
+                .with_for_update(skip_locked=True)
+            )
+            session.execute(
+                update(Permit)
+                .where(Permit.id.in_(oldest.scalar_subquery()), claimable)
+                .values(claimed_by=reviewer_id, claimed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+
+    unit_of_work(claim)
+    return held_permits(reviewer_id, limit)
+
+
+def held_permits(reviewer_id, limit=QUEUE_PAGE_SIZE):
+    """The oldest pending permits the reviewer holds, without touching any claims."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return (Permit.query
+            .filter_by(status='pending', claimed_by=reviewer_id)
+            .order_by(Permit.created_at, Permit.id)
+            .limit(limit)
+            .all())
+
+
+def decide_permits(reviewer_id, permit_ids, decision):
+    """
+    Approve or reject many pending permits in one set-based UPDATE.
+
+    Permits claimed by another reviewer (and not yet lapsed) are left alone.
+    Returns the ids of the permits that were decided.
+    """
+    status = DECISIONS[decision]
+    now = datetime.utcnow()
+    permit_ids = list({int(p) for p in permit_ids})
+    if not permit_ids:
+        return []
+
+    return unit_of_work(lambda session: session.execute(
+        update(Permit)
+        .where(
+            Permit.id.in_(permit_ids),
+            Permit.status == 'pending',
+            or_(Permit.claimed_by.is_(None),
+                Permit.claimed_by == reviewer_id,
+                Permit.claimed_at < now - CLAIM_TIMEOUT),
+        )
+        .values(status=status, reviewed_by=reviewer_id, reviewed_at=now,
+                claimed_by=None, claimed_at=None)
+        .returning(Permit.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all())
+
+
+def release_permits(reviewer_id):
+    """Hand every permit the reviewer still holds back to the queue."""
+    return unit_of_work(lambda session: session.execute(
+        update(Permit)
+        .where(Permit.claimed_by == reviewer_id, Permit.status == 'pending')
+        .values(claimed_by=None, claimed_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount)
@@ -2,7 +2,9 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app.models import Ticket, Permit, Vehicle, Inspection, User
 from app.models import Order
-from app import db
+from app.dot.permits import DECISIONS, MAX_PAGE_SIZE, QUEUE_PAGE_SIZE, claim_permits, decide_permits, held_permits, release_permits
+from app.audit import audit
+from app.unit_of_work import unit_of_work
 
 bp = Blueprint('dot', __name__, url_prefix='/dot')
 
@@ -33,9 +35,9 @@ def supervisor_panel():
         query = query.filter(Ticket.reason.ilike(f"%{search_term}%"))
 
     tickets = query.all()
-    permits = Permit.query.filter_by(status='pending').all()
+    pending_permits = Permit.query.filter_by(status='pending').count()
     vehicles = Vehicle.query.all()
-    return render_template("dot/supervisor_panel.html", tickets=tickets, permits=permits, vehicles=vehicles)
+    return render_template("dot/supervisor.html", tickets=tickets, pending_permits=pending_permits, vehicles=vehicles)
 
 
 @bp.route("/issue_ticket", methods=["POST"])
@@ -46,35 +48,61 @@ def issue_ticket():
         return redirect(url_for('dot.dot_home'))
 
     t = Ticket(reason=request.form['reason'], fine_amount=int(request.form['fine_amount']), issued_to=int(request.form['user_id']))
-    db.session.add(t)
-    db.session.commit()
+    unit_of_work(lambda session: session.add(t))
+    audit.record('ticket.issue', current_user.id, 'ticket', t.id,
+                 issued_to=t.issued_to, fine_amount=t.fine_amount, reason=t.reason)
     flash("Ticket issued.")
     return redirect(url_for("dot.supervisor_panel"))
 
-@bp.route("/permit/<int:permit_id>/approve")
+@bp.route("/permits/queue")
 @login_required
-def approve_permit(permit_id):
+def permit_queue():
     if current_user.role not in ['supervisor', 'admin']:
         flash("Access denied.")
         return redirect(url_for('dot.dot_home'))
 
-    permit = Permit.query.get_or_404(permit_id)
-    permit.status = "approved"
-    db.session.commit()
-    flash("Permit approved.")
-    return redirect(url_for("dot.supervisor_panel"))
+    limit = max(1, min(request.args.get('limit', QUEUE_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    permits = held_permits(current_user.id, limit)
+    return render_template("dot/permit_queue.html", permits=permits, limit=limit)
+
+@bp.route("/permits/claim", methods=["POST"])
+@login_required
+def claim_permit_page():
+    if current_user.role not in ['supervisor', 'admin']:
+        flash("Access denied.")
+        return redirect(url_for('dot.dot_home'))
+
+    limit = max(1, min(request.form.get('limit', QUEUE_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    claim_permits(current_user.id, limit)
+    return redirect(url_for("dot.permit_queue", limit=limit))
+
+@bp.route("/permits/decide", methods=["POST"])
+@login_required
+def decide_permit_batch():
+    if current_user.role not in ['supervisor', 'admin']:
+        flash("Access denied.")
+        return redirect(url_for('dot.dot_home'))
+
+    action = request.form.get('action')
+    if action not in DECISIONS:
+        flash("Unknown action.")
+        return redirect(url_for("dot.permit_queue"))
+
+    permit_ids = request.form.getlist('permit_ids', type=int)
+    decided = decide_permits(current_user.id, permit_ids, action)
+    audit.record_many(f'permit.{action}', current_user.id, 'permit', decided, batch_size=len(decided))
+    flash(f"{len(decided)} permit(s) {DECISIONS[action]}.")
+    return redirect(url_for("dot.permit_queue", limit=request.form.get('limit', QUEUE_PAGE_SIZE, type=int)))
 
-@bp.route("/permit/<int:permit_id>/reject")
+@bp.route("/permits/release", methods=["POST"])
 @login_required
-def reject_permit(permit_id):
+def release_permit_claims():
     if current_user.role not in ['supervisor', 'admin']:
         flash("Access denied.")
         return redirect(url_for('dot.dot_home'))
 
-    permit = Permit.query.get_or_404(permit_id)
-    permit.status = "rejected"
-    db.session.commit()
-    flash("Permit rejected.")
+    released = release_permits(current_user.id)
+    flash(f"{released} permit(s) returned to the queue.")
     return redirect(url_for("dot.supervisor_panel"))
 
 @bp.route("/log_inspection", methods=["POST"])
@@ -85,8 +113,9 @@ def log_inspection():
         return redirect(url_for('dot.dot_home'))
 
     insp = Inspection(vehicle_id=int(request.form['vehicle_id']), passed=(request.form['passed'] == '1'), notes=request.form['notes'])
-    db.session.add(insp)
-    db.session.commit()
+    unit_of_work(lambda session: session.add(insp))
+    audit.record('inspection.log', current_user.id, 'vehicle', insp.vehicle_id,
+                 inspection_id=insp.id, passed=insp.passed)
     flash("Inspection logged.")
     return redirect(url_for("dot.supervisor_panel"))
 @bp.route('/ticket/<int:ticket_id>/orders', methods=['GET', 'POST'])
@@ -103,8 +132,7 @@ def ticket_orders(ticket_id):
         quantity = int(request.form['quantity'])
         price_per_unit = float(request.form['price_per_unit'])
         order = Order(ticket_id=ticket.id, item_name=item_name, quantity=quantity, price_per_unit=price_per_unit)
-        db.session.add(order)
-        db.session.commit()
+        unit_of_work(lambda session: session.add(order))
         flash("Order added.")
         return redirect(url_for('dot.ticket_orders', ticket_id=ticket.id))
 
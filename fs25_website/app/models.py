@@ -16,7 +16,7 @@ class User(UserMixin, db.Model):
     company_id = db.Column(db.Integer, db.ForeignKey('company.id'))
 
     vehicles = db.relationship('Vehicle', backref='owner', lazy=True)
-    permits = db.relationship('Permit', backref='owner', lazy=True)
+    permits = db.relationship('Permit', backref='owner', lazy=True, foreign_keys='Permit.owner_id')
     tickets = db.relationship('Ticket', backref='issued_to_user', lazy=True)
 
 class Vehicle(db.Model):
@@ -57,6 +57,7 @@ class Ticket(db.Model):
     company_id = db.Column(db.Integer, db.ForeignKey('company.id'))
     paid = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    payment_id = db.Column(db.Integer, db.ForeignKey('payment.id'))  # set when the ticket is settled
 
     items = db.relationship('TicketItem', backref='ticket', lazy=True)
 
@@ -77,13 +78,33 @@ class TicketItem(db.Model):
     def total_price(self):
         return self.quantity * self.price_per_unit
 
+class Payment(db.Model):
+    __tablename__ = 'payment'
+    __table_args__ = (db.UniqueConstraint('user_id', 'idempotency_key'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    idempotency_key = db.Column(db.String(64), nullable=False)  # client-supplied, retries reuse it
+    amount = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    tickets = db.relationship('Ticket', backref='payment', lazy=True)
+
 class Permit(db.Model):
     __tablename__ = 'permit'
+    __table_args__ = (
+        db.Index('ix_permit_status_created_at', 'status', 'created_at'),  # review queue order
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     type = db.Column(db.String(50))
-    status = db.Column(db.String(20), default='pending')
+    status = db.Column(db.String(20), default='pending')  # pending, approved, rejected
     owner_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    claimed_by = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)  # reviewer holding it in their queue
+    claimed_at = db.Column(db.DateTime)
+    reviewed_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    reviewed_at = db.Column(db.DateTime)
 
 class Order(db.Model):
     __tablename__ = 'order'
@@ -97,3 +118,19 @@ class Order(db.Model):
     @property
     def total_price(self):
         return self.quantity * self.price_per_unit
+
+class AuditEvent(db.Model):
+    __tablename__ = 'audit_event'
+    __table_args__ = (
+        db.Index('ix_audit_event_actor_created_at', 'actor_id', 'created_at'),
+        db.Index('ix_audit_event_target_created_at', 'target_type', 'target_id', 'created_at'),
+    )
+
+    # Append-only: rows are written in batches by app.audit and never updated
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, index=True)
+    actor_id = db.Column(db.Integer)  # no FK so the trail outlives deleted users
+    action = db.Column(db.String(50), nullable=False)
+    target_type = db.Column(db.String(50))
+    target_id = db.Column(db.Integer)
+    details = db.Column(db.Text)  # JSON
@@ -0,0 +1,110 @@
+import uuid
+
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Payment, Ticket, TicketItem, User
+from app.unit_of_work import unit_of_work
+
+
+class PaymentError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def settle_tickets(user_id, ticket_ids, idempotency_key=None):
+    """
+    Pay one or more of a user's tickets from their balance in a single transaction.
+
+    Balance and ticket state are only changed through conditional UPDATEs, so
+    concurrent workers can never double-charge or overdraw: whichever request
+    loses the race matches zero rows and is rolled back. Retrying with the same
+    idempotency key returns the original payment instead of charging again.
+
+    Returns (payment, replayed).
+    """
+    ticket_ids = sorted({int(t) for t in ticket_ids})
+    if not ticket_ids:
+        raise PaymentError("No tickets given")
+    idempotency_key = idempotency_key or uuid.uuid4().hex
+    if not isinstance(idempotency_key, str):
+        raise PaymentError("Idempotency key must be a string")
+    if len(idempotency_key) > 64:
+        raise PaymentError("Idempotency key too long")
+
+    def settle(session):
+        existing = Payment.query.filter_by(user_id=user_id, idempotency_key=idempotency_key).first()
+        if existing:
+            return _replay(existing, ticket_ids), True
+
+        amount = _amount_due(user_id, ticket_ids)
+
+        payment = Payment(user_id=user_id, idempotency_key=idempotency_key, amount=amount)
+        session.add(payment)
+        try:
+            session.flush()
+        except IntegrityError:
+            # A concurrent retry with the same key got there first
+            session.rollback()
+            existing = Payment.query.filter_by(user_id=user_id, idempotency_key=idempotency_key).one()
+            return _replay(existing, ticket_ids), True
+
+        # Any PaymentError below rolls back the payment row and settled tickets
+        settled = session.execute(
+            update(Ticket)
+            .where(Ticket.id.in_(ticket_ids), Ticket.issued_to == user_id, Ticket.paid.isnot(True))
+            .values(paid=True, payment_id=payment.id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if settled != len(ticket_ids):
+            raise PaymentError("Ticket already paid", 409)
+
+        debited = session.execute(
+            update(User)
+            .where(User.id == user_id, User.balance >= amount, literal(amount) > 0)
+            .values(balance=User.balance - amount)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not debited:
+            raise PaymentError("Insufficient balance", 402)
+
+        return payment, False
+
+    return unit_of_work(settle)
+
+
+def payment_ticket_ids(payment):
+    return sorted(db.session.scalars(select(Ticket.id).where(Ticket.payment_id == payment.id)))
+
+
+def _amount_due(user_id, ticket_ids):
+    # Ticket.total_price in SQL, without loading tickets or their items
+    items_total = (
+        select(TicketItem.ticket_id, func.sum(TicketItem.quantity * TicketItem.price_per_unit).label('total'))
+        .where(TicketItem.ticket_id.in_(ticket_ids))
+        .group_by(TicketItem.ticket_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(Ticket.id, Ticket.paid, func.coalesce(Ticket.fine_amount, 0) + func.coalesce(items_total.c.total, 0))
+        .outerjoin(items_total, items_total.c.ticket_id == Ticket.id)
+        .where(Ticket.id.in_(ticket_ids), Ticket.issued_to == user_id)
+    ).all()
+
+    if len(rows) != len(ticket_ids):
+        raise PaymentError("Ticket not found", 404)
+    if any(paid for _, paid, _ in rows):
+        raise PaymentError("Ticket already paid", 409)
+    # A zero or negative total would credit the payer instead of charging them
+    if any(total <= 0 for _, _, total in rows):
+        raise PaymentError("Ticket has no positive amount due", 422)
+    return float(sum(total for _, _, total in rows))
+
+
+def _replay(payment, ticket_ids):
+    if payment_ticket_ids(payment) != ticket_ids:
+        raise PaymentError("Idempotency key was used for different tickets", 422)
+    return payment
@@ -1,6 +1,9 @@
+import math
 from flask import Blueprint, request, jsonify
-from app import db
+from sqlalchemy import insert
 from app.models import Ticket, TicketItem, User, Company
+from app.tickets.payments import PaymentError, payment_ticket_ids, settle_tickets
+from app.unit_of_work import unit_of_work
 from flask_login import login_required, current_user
 
 bp = Blueprint('tickets', __name__, url_prefix='/tickets')
@@ -48,7 +51,7 @@ def create_ticket():
     }
     """
     data = request.get_json()
-    if not data:
+    if not data or not isinstance(data, dict):
         return jsonify({"error": "Invalid input"}), 400
 
     reason = data.get('reason')
@@ -59,19 +62,92 @@ def create_ticket():
     if not reason or not company_id:
         return jsonify({"error": "Missing required fields"}), 400
 
+    try:
+        company_id = int(company_id)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid company id"}), 400
+
+    try:
+        fine_amount = float(fine_amount)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid fine amount"}), 400
+    # float() accepts "nan" and "inf"; SQLite stores NaN as NULL
+    if not math.isfinite(fine_amount) or fine_amount < 0:
+        return jsonify({"error": "Invalid fine amount"}), 400
+    if not isinstance(items_data, list):
+        return jsonify({"error": "Invalid items"}), 400
+
     # Verify company exists
     company = Company.query.get(company_id)
     if not company:
         return jsonify({"error": "Company not found"}), 404
 
-    ticket = Ticket(
-        reason=reason,
-        fine_amount=fine_amount,
-        issued_to=current_user.id,
-        company_id=company_id
-    )
-    db.session.add(ticket)
-    db.session.flush()  # To get ticket.id before commit
-
+    items = []
     for item in items_data:
-        material_name_
+        try:
+            material_name = item.get('material_name')
+            quantity = int(item.get('quantity'))
+            price_per_unit = float(item.get('price_per_unit'))
+        except (AttributeError, TypeError, ValueError):
+            return jsonify({"error": "Invalid item"}), 400
+        if not material_name or quantity <= 0 or not math.isfinite(price_per_unit) or price_per_unit < 0:
+            return jsonify({"error": "Invalid item"}), 400
+
+        items.append({
+            'material_name': material_name,
+            'quantity': quantity,
+            'price_per_unit': price_per_unit
+        })
+
+    def create(session):
+        ticket = Ticket(
+            reason=reason,
+            fine_amount=fine_amount,
+            issued_to=current_user.id,
+            company_id=company_id
+        )
+        session.add(ticket)
+        session.flush()  # To get ticket.id for the items
+
+        # One executemany for all items instead of an INSERT per ORM object
+        if items:
+            session.execute(insert(TicketItem), [dict(item, ticket_id=ticket.id) for item in items])
+        return ticket
+
+    ticket = unit_of_work(create)
+    return jsonify({"message": "Ticket created", "ticket_id": ticket.id}), 201
+
+
+@bp.route('/pay', methods=['POST'])
+@login_required
+def pay_tickets():
+    """
+    Expected JSON:
+    {
+      "ticket_ids": [1, 2, 3]
+    }
+    Send an Idempotency-Key header (or "idempotency_key" field) and reuse it
+    when retrying; a repeated key returns the original payment without charging again.
+    """
+    data = request.get_json()
+    if not isinstance(data, dict) or not isinstance(data.get('ticket_ids'), list):
+        return jsonify({"error": "Invalid input"}), 400
+
+    idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+    if idempotency_key is not None and not isinstance(idempotency_key, str):
+        return jsonify({"error": "Idempotency key must be a string"}), 400
+    try:
+        payment, replayed = settle_tickets(current_user.id, data['ticket_ids'], idempotency_key)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid ticket id"}), 400
+    except PaymentError as e:
+        return jsonify({"error": e.message}), e.status_code
+
+    return jsonify({
+        'payment_id': payment.id,
+        'idempotency_key': payment.idempotency_key,
+        'amount': payment.amount,
+        'ticket_ids': payment_ticket_ids(payment),
+        'created_at': payment.created_at.isoformat(),
+        'replayed': replayed
+    }), 200 if replayed else 201
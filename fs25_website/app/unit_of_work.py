@@ -0,0 +1,49 @@
+import random
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from app import db
+
+LOCK_RETRIES = 5
+LOCK_BACKOFF = 0.05  # seconds, doubled on every retry
+
+
+def unit_of_work(work, retries=LOCK_RETRIES, backoff=LOCK_BACKOFF, expire_on_commit=False):
+    """
+    Run work(session) as one transaction and commit it.
+
+    Autoflush is off inside work, so queries don't push half-built rows to the
+    database; call session.flush() explicitly where a generated id is needed.
+    Committed objects are not expired by default: handlers that only redirect
+    or echo ids back don't need the reload SELECTs.
+
+    If SQLite reports ``database is locked``, the transaction is rolled back and
+    work is run again with exponential backoff, so work must do all of its
+    writes itself and have no side effects outside the session. Any other
+    exception rolls back and propagates. Returns whatever work returns.
+    """
+    session = db.session()
+    previous_expire = session.expire_on_commit
+    session.expire_on_commit = expire_on_commit
+    try:
+        for attempt in range(retries + 1):
+            try:
+                with session.no_autoflush:
+                    result = work(session)
+                session.commit()
+                return result
+            except OperationalError as e:
+                session.rollback()
+                if not _is_locked(e) or attempt == retries:
+                    raise
+                time.sleep(backoff * 2 ** attempt * (1 + random.random()))
+            except BaseException:
+                session.rollback()
+                raise
+    finally:
+        session.expire_on_commit = previous_expire
+
+
+def _is_locked(error):
+    return 'database is locked' in str(error.orig)
@@ -0,0 +1,39 @@
+import multiprocessing
+import os
+
+# Cloud Run / Render inject PORT
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# Threaded workers: requests mostly wait on SQLite / network, not CPU
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import the app (blueprints, models, compiled templates) once in the master
+# and fork workers from it instead of cold-starting each one
+preload_app = True
+
+# Recycle workers periodically; jitter stops them all restarting at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 10
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    # Never share pooled DB connections between the master and its workers
+    from app import db
+    from wsgi import app
+
+    with app.app_context():
+        db.engine.dispose()
+
+
+def worker_exit(server, worker):
+    # Write out audit events still buffered in this worker
+    from app.audit import audit
+    from wsgi import app
+
+    audit.shutdown(app)
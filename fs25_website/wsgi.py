@@ -0,0 +1,5 @@
+"""Production entry point: gunicorn -c gunicorn.conf.py wsgi:app"""
+from app import create_app, warm_template_cache
+
+app = create_app({'ENABLE_MIGRATIONS': False})
+warm_template_cache(app)
@@ -0,0 +1,105 @@
+"""Measure ticket-creation commits/sec: per-object writes vs unit_of_work.
+
+"before" is the old create_ticket shape: autoflush on, one ORM INSERT per
+TicketItem, expire-on-commit reload of the ticket, no retry. "after" uses
+unit_of_work with one executemany for the items. Both run against a
+throwaway SQLite file, single-threaded and with concurrent writers.
+
+    python scripts/bench_commits.py
+    python scripts/bench_commits.py --tickets 2000 --items 10 --threads 8 --timeout 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'fs25_website'))
+
+from app import create_app, db
+from app.models import Company, Ticket, TicketItem, User
+from app.unit_of_work import unit_of_work
+
+
+def items_for(n):
+    return [{'material_name': f'Material {i}', 'quantity': i + 1, 'price_per_unit': 2.5} for i in range(n)]
+
+
+def before(user_id, company_id, items):
+    ticket = Ticket(reason='Load check', fine_amount=10, issued_to=user_id, company_id=company_id)
+    db.session.add(ticket)
+    db.session.flush()
+    for item in items:
+        db.session.add(TicketItem(ticket_id=ticket.id, **item))
+    db.session.commit()
+    return ticket.id
+
+
+def after(user_id, company_id, items):
+    def create(session):
+        ticket = Ticket(reason='Load check', fine_amount=10, issued_to=user_id, company_id=company_id)
+        session.add(ticket)
+        session.flush()
+        session.execute(insert(TicketItem), [dict(item, ticket_id=ticket.id) for item in items])
+        return ticket
+
+    return unit_of_work(create).id
+
+
+def measure(app, write, tickets, items, threads):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user, company = User(username='bench', password='x'), Company(name='Bench Co')
+        db.session.add_all([user, company])
+        db.session.commit()
+        user_id, company_id = user.id, company.id
+    payload = items_for(items)
+
+    def one(_):
+        with app.app_context():
+            try:
+                write(user_id, company_id, payload)
+                return True
+            except OperationalError:
+                db.session.rollback()
+                return False
+            finally:
+                db.session.remove()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one, range(tickets)))
+    elapsed = time.perf_counter() - start
+    failures = results.count(False)
+    return (tickets - failures) / elapsed, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickets', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--timeout', type=float, default=5.0, help='SQLite busy timeout in seconds')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db'),
+            'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': args.timeout}},
+            'ENABLE_MIGRATIONS': False,
+        })
+        for threads in (1, args.threads):
+            for label, write in (('before', before), ('after', after)):
+                rate, failures = measure(app, write, args.tickets, args.items, threads)
+                print(f'{label:<7} {threads:>2} thread(s): {rate:8.1f} commits/sec, {failures} failed (database locked)')
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Measure cold start to first served request.
+
+Each run starts a fresh interpreter, builds the app through the given entry
+point and serves GET /auth/login with the test client.
+
+    python scripts/bench_startup.py                  # compare run.py vs wsgi.py
+    python scripts/bench_startup.py --runs 20
+    python scripts/bench_startup.py --gunicorn       # time real gunicorn boot instead
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'fs25_website')
+
+CHILD = """
+import time
+t0 = time.perf_counter()
+import {module} as entry
+t1 = time.perf_counter()
+resp = entry.app.test_client().get('/auth/login')
+t2 = time.perf_counter()
+assert resp.status_code == 200, resp.status_code
+print(t1 - t0, t2 - t1)
+"""
+
+
+def run_child(module, env):
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD.format(module=module)],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    total = time.perf_counter() - start
+    return float(out[0]), float(out[1]), total
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def run_gunicorn(module, env):
+    port = free_port()
+    env = dict(env, PORT=str(port), WEB_CONCURRENCY='2')
+    args = [sys.executable, '-m', 'gunicorn', f'{module}:app']
+    if module == 'wsgi':
+        args[3:3] = ['-c', 'gunicorn.conf.py']
+    else:
+        args[3:3] = ['--bind', f'0.0.0.0:{port}', '--workers', '2']
+    start = time.perf_counter()
+    proc = subprocess.Popen(args, cwd=APP_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/auth/login', timeout=1).read()
+                return time.perf_counter() - start
+            except OSError:
+                if proc.poll() is not None:
+                    raise RuntimeError('gunicorn exited during startup')
+                time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize(label, samples):
+    print(f"{label:<36} median {statistics.median(samples) * 1000:8.1f} ms"
+          f"   min {min(samples) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--gunicorn', action='store_true')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        base_env = dict(os.environ)
+        base_env.pop('TEMPLATE_CACHE_DIR', None)
+        cached_env = dict(base_env, TEMPLATE_CACHE_DIR=cache_dir)
+        # Populate the bytecode cache the way the docker build does
+        subprocess.run([sys.executable, '-c', 'import wsgi'], cwd=APP_DIR, env=cached_env, check=True)
+
+        cases = [('run', base_env, 'run.py'), ('wsgi', cached_env, 'wsgi.py + template cache')]
+        for module, env, label in cases:
+            if args.gunicorn:
+                summarize(f'gunicorn {label}', [run_gunicorn(module, env) for _ in range(args.runs)])
+                continue
+            samples = [run_child(module, env) for _ in range(args.runs)]
+            summarize(f'{label}: import', [s[0] for s in samples])
+            summarize(f'{label}: first request', [s[1] for s in samples])
+            summarize(f'{label}: total', [s[2] for s in samples])
+
+
+if __name__ == '__main__':
+    main()
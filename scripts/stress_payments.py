@@ -0,0 +1,138 @@
+"""Concurrency stress check for ticket payments.
+
+50 parallel payers hammer settle_tickets() against a throwaway SQLite file:
+duplicate retries with the same idempotency key, overlapping payments for the
+same ticket, and payments that would overdraw the balance. Afterwards every
+balance must equal its starting balance minus exactly what was settled.
+
+    python scripts/stress_payments.py
+    python scripts/stress_payments.py --payers 50 --rounds 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'fs25_website'))
+
+from app import create_app, db
+from app.models import Payment, Ticket, TicketItem, User
+from app.tickets.payments import PaymentError, settle_tickets
+
+START_BALANCE = 100.0
+
+
+def seed(payers):
+    jobs = []
+    for n in range(payers):
+        user = User(username=f'payer{n}', password='x', balance=START_BALANCE)
+        db.session.add(user)
+        db.session.flush()
+        # 60 + 50 > balance, so at most one of the two can ever be paid
+        t1 = Ticket(reason='Speeding', fine_amount=60.0, issued_to=user.id)
+        t2 = Ticket(reason='Overweight load', fine_amount=40.0, issued_to=user.id)
+        db.session.add_all([t1, t2])
+        db.session.flush()
+        db.session.add(TicketItem(ticket_id=t2.id, material_name='Gravel', quantity=2, price_per_unit=5.0))
+
+        jobs += [(user.id, [t1.id], f'k1-{n}')] * 3          # client retries
+        jobs += [(user.id, [t2.id], f'k2-{n}')] * 2
+        jobs += [(user.id, [t1.id, t2.id], f'k3-{n}')]       # would overdraw
+        jobs += [(user.id, [t1.id], f'k4-{n}')]              # same ticket, new key
+    db.session.commit()
+    return jobs
+
+
+def run_round(app, payers):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        jobs = seed(payers)
+    random.shuffle(jobs)
+
+    barrier = threading.Barrier(payers)
+    outcomes = Counter()
+
+    def pay(job):
+        user_id, ticket_ids, key = job
+        with app.app_context():
+            try:
+                barrier.wait(timeout=1)
+            except threading.BrokenBarrierError:
+                pass
+            try:
+                _, replayed = settle_tickets(user_id, ticket_ids, key)
+                outcomes['replayed' if replayed else 'paid'] += 1
+            except PaymentError as e:
+                outcomes[f'rejected {e.status_code}'] += 1
+            except OperationalError:
+                db.session.rollback()
+                outcomes['database locked'] += 1
+            finally:
+                db.session.remove()
+
+    with ThreadPoolExecutor(max_workers=payers) as pool:
+        list(pool.map(pay, jobs))
+
+    with app.app_context():
+        errors = verify()
+    return outcomes, errors
+
+
+def verify():
+    errors = []
+    for user in User.query.all():
+        payments = Payment.query.filter_by(user_id=user.id).all()
+        tickets = Ticket.query.filter_by(issued_to=user.id).all()
+        charged = sum(p.amount for p in payments)
+        settled = sum(t.total_price for t in tickets if t.paid)
+
+        if user.balance < 0:
+            errors.append(f'{user.username}: overdrawn to {user.balance}')
+        if abs(user.balance - (START_BALANCE - charged)) > 1e-9:
+            errors.append(f'{user.username}: balance {user.balance} but charged {charged}')
+        if abs(charged - settled) > 1e-9:
+            errors.append(f'{user.username}: charged {charged} but settled tickets total {settled}')
+        for t in tickets:
+            if t.paid != (t.payment_id is not None):
+                errors.append(f'ticket {t.id}: paid={t.paid} payment_id={t.payment_id}')
+        for p in payments:
+            if not p.tickets:
+                errors.append(f'payment {p.id}: settles no tickets')
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--payers', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'stress.db'),
+            'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 30}},
+            'ENABLE_MIGRATIONS': False,
+        })
+        failed = False
+        for n in range(args.rounds):
+            outcomes, errors = run_round(app, args.payers)
+            print(f'round {n + 1}: ' + ', '.join(f'{k}={v}' for k, v in sorted(outcomes.items())))
+            for e in errors:
+                print('  FAIL', e)
+            failed = failed or bool(errors)
+        with app.app_context():
+            db.engine.dispose()
+
+    print('FAILED' if failed else 'OK: no lost updates, double charges or overdrafts')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import pytest
+
+from app import db
+from app.models import Payment, Ticket, TicketItem, User
+from app.tickets.payments import PaymentError, settle_tickets
+
+
+@pytest.fixture
+def payer(app):
+    user = User(username='payer', password='x', balance=100.0)
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def make_ticket(user_id, fine_amount, items=()):
+    ticket = Ticket(reason='Speeding', fine_amount=fine_amount, issued_to=user_id)
+    db.session.add(ticket)
+    db.session.flush()
+    for quantity, price_per_unit in items:
+        db.session.add(TicketItem(ticket_id=ticket.id, material_name='Gravel',
+                                  quantity=quantity, price_per_unit=price_per_unit))
+    db.session.commit()
+    return ticket.id
+
+
+def balance(user_id):
+    return db.session.scalar(db.select(User.balance).where(User.id == user_id))
+
+
+def test_pay_charges_ticket_total_and_marks_paid(payer):
+    ticket_id = make_ticket(payer, 20.0, items=[(2, 5.0)])
+
+    payment, replayed = settle_tickets(payer, [ticket_id], 'key-1')
+
+    assert not replayed
+    assert payment.amount == 30.0
+    assert balance(payer) == 70.0
+    assert db.session.get(Ticket, ticket_id).payment_id == payment.id
+
+
+def test_retry_with_same_key_replays_without_charging_again(payer):
+    ticket_id = make_ticket(payer, 30.0)
+    first, _ = settle_tickets(payer, [ticket_id], 'key-1')
+
+    again, replayed = settle_tickets(payer, [ticket_id], 'key-1')
+
+    assert replayed
+    assert again.id == first.id
+    assert balance(payer) == 70.0
+    assert Payment.query.count() == 1
+
+
+def test_reusing_key_for_other_tickets_is_rejected(payer):
+    first = make_ticket(payer, 10.0)
+    second = make_ticket(payer, 10.0)
+    settle_tickets(payer, [first], 'key-1')
+
+    with pytest.raises(PaymentError) as e:
+        settle_tickets(payer, [second], 'key-1')
+
+    assert e.value.status_code == 422
+    assert balance(payer) == 90.0
+
+
+def test_paying_a_paid_ticket_with_new_key_is_rejected(payer):
+    ticket_id = make_ticket(payer, 10.0)
+    settle_tickets(payer, [ticket_id], 'key-1')
+
+    with pytest.raises(PaymentError) as e:
+        settle_tickets(payer, [ticket_id], 'key-2')
+
+    assert e.value.status_code == 409
+    assert balance(payer) == 90.0
+
+
+def test_overdraft_is_rejected_and_rolled_back(payer):
+    ticket_id = make_ticket(payer, 150.0)
+
+    with pytest.raises(PaymentError) as e:
+        settle_tickets(payer, [ticket_id], 'key-1')
+
+    assert e.value.status_code == 402
+    assert balance(payer) == 100.0
+    assert not db.session.get(Ticket, ticket_id).paid
+    assert Payment.query.count() == 0
+
+
+def test_non_positive_total_is_rejected(payer):
+    ticket_id = make_ticket(payer, 0.0, items=[(-1000, 10.0)])
+
+    with pytest.raises(PaymentError) as e:
+        settle_tickets(payer, [ticket_id], 'key-1')
+
+    assert e.value.status_code == 422
+    assert balance(payer) == 100.0
@@ -0,0 +1,41 @@
+import pytest
+
+from app import db
+from app.dot.permits import claim_permits, decide_permits
+from app.models import Permit, User
+
+
+@pytest.fixture
+def reviewers(app):
+    first, second = User(username='sup1', password='x'), User(username='sup2', password='x')
+    db.session.add_all([first, second])
+    db.session.flush()
+    db.session.execute(db.insert(Permit), [{'type': 'heavy_load', 'owner_id': first.id}] * 200)
+    db.session.commit()
+    return first.id, second.id
+
+
+def test_reviewers_get_disjoint_pages(reviewers):
+    first, second = reviewers
+
+    page_one = {p.id for p in claim_permits(first, 80)}
+    page_two = {p.id for p in claim_permits(second, 80)}
+
+    assert len(page_one) == len(page_two) == 80
+    assert not page_one & page_two
+
+
+def test_claimed_page_is_capped_to_limit(reviewers):
+    first, _ = reviewers
+    claim_permits(first, 150)
+
+    assert len(claim_permits(first, 20)) == 20
+
+
+def test_decide_skips_permits_held_by_another_reviewer(reviewers):
+    first, second = reviewers
+    held = [p.id for p in claim_permits(first, 10)]
+
+    assert decide_permits(second, held, 'approve') == []
+    assert sorted(decide_permits(first, held, 'approve')) == sorted(held)
+    assert Permit.query.filter_by(status='approved').count() == 10